@@ -9,34 +9,136 @@ directory, builds a GeoImageFrame, and upserts rows into the target table.
 from __future__ import annotations
 
 import argparse
+import io
+import multiprocessing
 import sys
 import os
+import queue
+import re
+import threading
 import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Iterable, Tuple
+from typing import Iterable, Iterator, Tuple
 
+import numpy as np
+import pandas as pd
+import pytz
+import shapely
 from dotenv import load_dotenv
+from geopandas import points_from_xy
+from PIL import Image
+from timezonefinder import TimezoneFinder
 
+try:
+    from turbojpeg import TJFLAG_PROGRESSIVE, TJPF_RGB, TJSAMP_420, TurboJPEG
+except ImportError:  # optional; Pillow encodes thumbnails without it
+    TurboJPEG = None
+
+from landlensdb.geoclasses.geoimageframe import GeoImageFrame
 from landlensdb.handlers.db import Postgres
 from landlensdb.handlers.image import Local
+import psycopg2
+from psycopg2 import sql
 from sqlalchemy import text
+from sqlalchemy.engine import make_url
 
 ALLOWED_EXTENSIONS = (".jpg", ".jpeg")
+# Set form for the per-file suffix lookup in iter_image_paths.
+ALLOWED_SUFFIXES = frozenset(ALLOWED_EXTENSIONS)
+# SOI marker followed by the first segment marker.
+JPEG_SIGNATURE = b"\xff\xd8\xff"
+SKIPPED_DIR_NAMES = ("__MACOSX", "thumbnails")
+# Marks a skip-trie node as a directory to prune; None can't collide with a name.
+SKIP_MARK = None
 DEFAULT_THUMBNAIL_SIZE = (256, 256)
+# Either x or , separates width and height; empty fields are ignored.
+THUMBNAIL_SIZE_SEPARATOR = re.compile(r"[xX,]")
+TRUTHY_VALUES = frozenset({"1", "true", "yes", "y", "on"})
+THUMBNAIL_QUALITY = 85
+DEFAULT_BATCH_SIZE = 5000
+STAGING_TABLE = "landlens_import_stage"
+EXTRACT_CHUNKSIZE = 64
+PREFETCH_WINDOW = 128
+STREAM_BATCH_SIZE = 10000
+URL_LOOKUP_CHUNK_SIZE = 10000
+UPSERT_QUEUE_SIZE = 4
+QUEUE_POLL_SECONDS = 0.1
+# Imported once by the forkserver so extraction workers fork with them loaded;
+# __main__ pulls in landlensdb, PIL and timezonefinder via this module's imports.
+FORKSERVER_PRELOAD = ["__main__", "PIL.Image", "PIL.ExifTags"]
+
+# Fields returned by FilteredLocal.load_image, in order, with their column dtypes.
+ROW_COLUMNS = (
+    ("lon", np.float64),
+    ("lat", np.float64),
+    ("name", object),
+    ("altitude", np.float32),
+    ("camera_type", object),
+    ("captured_at", object),
+    ("compass_angle", np.float32),
+    ("exif_orientation", np.float32),
+    ("image_url", object),
+    ("thumb_url", object),
+)
+THUMB_URL_INDEX = [col for col, _ in ROW_COLUMNS].index("thumb_url")
+# Column order of Local.load_images; geometry is appended last.
+FRAME_COLUMNS = (
+    "name",
+    "altitude",
+    "camera_type",
+    "camera_parameters",
+    "captured_at",
+    "compass_angle",
+    "exif_orientation",
+    "image_url",
+    "thumb_url",
+)
+
+# Numeric fields sent from float arrays, which may land in integer columns.
+FLOAT_COLUMNS = frozenset({"altitude", "compass_angle", "exif_orientation", "camera_parameters"})
+
+# Skip reasons returned by FilteredLocal.load_image in place of a row.
+SKIP_UNREADABLE = "unreadable images"
+SKIP_NO_GEOTAGS = "images without usable EXIF GPS data"
+
+# Built lazily once per worker process; construction loads the timezone polygons.
+_timezone_finder: TimezoneFinder | None = None
+# Likewise for the TurboJPEG handle, which dlopens libturbojpeg; None once loading fails.
+_turbo_jpeg = None
+_turbo_jpeg_loaded = False
+
+
+def get_turbo_jpeg():
+    """
+    Return this process's TurboJPEG encoder, or None to fall back to Pillow.
+    """
+    global _turbo_jpeg, _turbo_jpeg_loaded
+    if not _turbo_jpeg_loaded:
+        _turbo_jpeg_loaded = True
+        if TurboJPEG is not None:
+            try:
+                _turbo_jpeg = TurboJPEG()
+            except (OSError, RuntimeError):
+                # PyTurboJPEG is installed but the libturbojpeg shared library isn't.
+                _turbo_jpeg = None
+    return _turbo_jpeg
 
 
 def parse_bool(value: str | None, default: bool = True) -> bool:
     if value is None:
         return default
-    return value.strip().lower() in {"1", "true", "yes", "y", "on"}
+    return value.strip().lower() in TRUTHY_VALUES
 
 
 def parse_thumbnail_size(raw: str | None) -> Tuple[int, int]:
     if not raw:
         return DEFAULT_THUMBNAIL_SIZE
 
-    normalized = raw.lower().replace("x", ",")
-    parts = [p for p in normalized.split(",") if p]
+    parts = [p for p in THUMBNAIL_SIZE_SEPARATOR.split(raw) if p]
     if len(parts) != 2:
         raise ValueError("Thumbnail size must look like 256x256 or 256,256")
     try:
@@ -45,23 +147,61 @@ def parse_thumbnail_size(raw: str | None) -> Tuple[int, int]:
         raise ValueError("Thumbnail size values must be integers") from exc
 
 
+def parse_positive_int(raw: str | int | None, default: int | None, label: str) -> int | None:
+    if raw is None or raw == "":
+        return default
+    try:
+        value = int(raw)
+    except ValueError as exc:
+        raise ValueError(f"{label} must be an integer") from exc
+    if value < 1:
+        raise ValueError(f"{label} must be at least 1")
+    return value
+
+
+def with_psycopg2_driver(database_url: str) -> str:
+    """
+    Pin plain postgresql:// URLs to psycopg2, whose COPY support the upsert uses.
+    """
+    drivername = make_url(database_url).drivername
+    if drivername == "postgresql":
+        return "postgresql+psycopg2" + database_url[database_url.index("://"):]
+    if drivername != "postgresql+psycopg2":
+        raise ValueError(
+            "LANDLENS_DATABASE_URL must use the psycopg2 driver "
+            f"(postgresql:// or postgresql+psycopg2://), not '{drivername}'"
+        )
+    return database_url
+
+
 def load_config(args: argparse.Namespace) -> dict:
     load_dotenv()
+    env = os.environ
 
-    database_url = args.database_url or os.getenv("LANDLENS_DATABASE_URL")
-    table_name = args.table or os.getenv("LANDLENS_TABLE")
-    table_schema = args.schema or os.getenv("LANDLENS_TABLE_SCHEMA") or None
-    conflict = args.conflict or os.getenv("LANDLENS_ON_CONFLICT", "update")
+    database_url = args.database_url or env.get("LANDLENS_DATABASE_URL")
+    table_name = args.table or env.get("LANDLENS_TABLE")
+    table_schema = args.schema or env.get("LANDLENS_TABLE_SCHEMA") or None
+    conflict = args.conflict or env.get("LANDLENS_ON_CONFLICT", "update")
     if conflict not in {"update", "nothing"}:
         raise ValueError("LANDLENS_ON_CONFLICT must be 'update' or 'nothing'")
 
-    env_thumbnails = parse_bool(os.getenv("LANDLENS_CREATE_THUMBNAILS"), True)
+    env_thumbnails = parse_bool(env.get("LANDLENS_CREATE_THUMBNAILS"), True)
     create_thumbnails = env_thumbnails and not args.no_thumbnails
     thumb_size = parse_thumbnail_size(
-        args.thumbnail_size or os.getenv("LANDLENS_THUMBNAIL_SIZE")
+        args.thumbnail_size or env.get("LANDLENS_THUMBNAIL_SIZE")
+    )
+    batch_size = parse_positive_int(
+        args.batch_size if args.batch_size is not None else env.get("LANDLENS_BATCH_SIZE"),
+        DEFAULT_BATCH_SIZE,
+        "Batch size",
+    )
+    workers = parse_positive_int(
+        args.workers if args.workers is not None else env.get("LANDLENS_WORKERS"),
+        None,
+        "Worker count",
     )
     skip_existing_dirs = parse_bool(
-        os.getenv("LANDLENS_SKIP_EXISTING_DIRS"), False
+        env.get("LANDLENS_SKIP_EXISTING_DIRS"), False
     ) or args.skip_existing_dirs
 
     missing = []
@@ -73,125 +213,478 @@ def load_config(args: argparse.Namespace) -> dict:
         raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
 
     return {
-        "database_url": database_url,
+        "database_url": with_psycopg2_driver(database_url),
         "table_name": table_name,
         "table_schema": table_schema,
         "conflict": conflict,
         "create_thumbnails": create_thumbnails,
         "thumbnail_size": thumb_size,
+        "batch_size": batch_size,
+        "workers": workers,
         "skip_existing_dirs": skip_existing_dirs,
     }
 
 
-def load_images_filtered(
-    root: Path,
-    create_thumbnails: bool,
-    thumbnail_size: Tuple[int, int],
-    skip_dirs: Iterable[Path],
-):
+def build_skip_trie(root: Path, skip_dirs: Iterable[Path]) -> dict:
     """
-    Patch os.walk within landlensdb to filter directories/files and skip known paths.
+    Index skip directories under root by path component.
+
+    A node holding SKIP_MARK is a directory to prune; directories outside root
+    can never be reached by the walk and are left out.
     """
-    from landlensdb.handlers import image as image_module
+    trie: dict = {}
+    for path in skip_dirs:
+        try:
+            parts = Path(path).relative_to(root).parts
+        except ValueError:
+            continue
+        node = trie
+        for part in parts:
+            node = node.setdefault(part, {})
+        node[SKIP_MARK] = True
+    return trie
 
-    skip_set = {p.resolve() for p in skip_dirs}
-    original_walk = image_module.os.walk
-    original_get_exif = image_module.Local.get_exif_data
-    original_image_open = image_module.Image.open
 
-    def safe_get_exif(img):
+def iter_image_paths(root: Path, skip_dirs: Iterable[Path]) -> Iterator[str]:
+    """
+    Yield JPEG paths under root, pruning skip directories, thumbnail folders,
+    and macOS metadata folders. root must be resolved, like the skip paths.
+    """
+    trie = build_skip_trie(root, skip_dirs)
+    if SKIP_MARK in trie:
+        return
+
+    pending = [(str(root), trie)]
+    while pending:
+        current, node = pending.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if name in SKIPPED_DIR_NAMES:
+                    continue
+                child = node.get(name) if node else None
+                if child is not None and SKIP_MARK in child:
+                    continue
+                subdirs.append((entry.path, child))
+                continue
+            # Follows symlinks, so linked JPEGs are kept but links to directories,
+            # FIFOs, and sockets named *.jpg are not.
+            if not entry.is_file():
+                continue
+            dot = name.rfind(".")
+            if dot >= 0 and name[dot:].lower() in ALLOWED_SUFFIXES:
+                yield entry.path
+        # Reverse so directories are visited in listing order, like os.walk.
+        pending.extend(reversed(subdirs))
+
+
+def has_jpeg_signature(path: str) -> bool:
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            return os.read(fd, len(JPEG_SIGNATURE)) == JPEG_SIGNATURE
+        finally:
+            os.close(fd)
+    except OSError:
+        return False
+
+
+class FilteredLocal(Local):
+    """
+    landlensdb's Local with per-file entry points for the parallel importer.
+
+    get_exif_data tolerates images without EXIF support, create_thumbnail
+    decodes JPEGs at reduced scale, and load_image builds
+    one row the same way Local.load_images does inside its directory walk, so
+    workers can be handed pre-filtered paths instead of patching os.walk.
+    """
+
+    @staticmethod
+    def open_image(path: str):
+        # Files that merely carry a .jpg name (WebP, HEIC, truncated downloads)
+        # are rejected from their first bytes instead of PIL's exception path.
+        if not has_jpeg_signature(path):
+            return None
+        try:
+            return Image.open(path)
+        except Exception:
+            return None
+
+    @staticmethod
+    def get_exif_data(img) -> dict:
         if img is None:
             return {}
         try:
-            return original_get_exif(img)
+            return Local.get_exif_data(img)
         except Exception:
             # If an image lacks EXIF support, return empty so it gets skipped gracefully.
             return {}
 
-    def safe_image_open(path):
+    @staticmethod
+    def create_thumbnail(image_path: str, size: Tuple[int, int] = DEFAULT_THUMBNAIL_SIZE) -> str:
+        """
+        Write thumbnails/thumb_<name> next to image_path, like Local.create_thumbnail.
+        """
+        if not os.path.exists(image_path):
+            raise FileNotFoundError(f"Image file not found: {image_path}")
+
+        thumbnail_dir = os.path.join(os.path.dirname(image_path), "thumbnails")
+        os.makedirs(thumbnail_dir, exist_ok=True)
+        thumbnail_path = os.path.join(thumbnail_dir, f"thumb_{os.path.basename(image_path)}")
+
         try:
-            return original_image_open(path)
-        except Exception:
-            warnings.warn(f"Skipping unreadable image: {path}")
-            return None
+            with Image.open(image_path) as img:
+                if img.mode in ("RGBA", "LA"):
+                    img = img.convert("RGB")
+                img.thumbnail(size, Image.Resampling.LANCZOS)
+                turbo_jpeg = get_turbo_jpeg()
+                if turbo_jpeg is None:
+                    img.save(
+                        thumbnail_path,
+                        "JPEG",
+                        quality=THUMBNAIL_QUALITY,
+                        progressive=True,
+                        optimize=False,
+                    )
+                    return thumbnail_path
+                if img.mode != "RGB":
+                    img = img.convert("RGB")
+                encoded = turbo_jpeg.encode(
+                    np.asarray(img),
+                    quality=THUMBNAIL_QUALITY,
+                    pixel_format=TJPF_RGB,
+                    jpeg_subsample=TJSAMP_420,
+                    flags=TJFLAG_PROGRESSIVE,
+                )
+            with open(thumbnail_path, "wb") as f:
+                f.write(encoded)
+            return thumbnail_path
+        except Exception as e:
+            raise ValueError(f"Error creating thumbnail for {image_path}: {e}") from e
+
+    @classmethod
+    def load_image(
+        cls,
+        path: str,
+        create_thumbnails: bool,
+        thumbnail_size: Tuple[int, int],
+    ) -> tuple | str:
+        """
+        Build one row for path, ordered like ROW_COLUMNS.
 
-    def filtered_walk(top):
-        if Path(top).resolve() in skip_set:
-            return
-        for current_root, dirnames, filenames in original_walk(top):
-            # Drop known skip directories and macOS metadata folders.
-            dirnames[:] = [
-                d
-                for d in dirnames
-                if (Path(current_root) / d).resolve() not in skip_set
-                and d != "__MACOSX"
-            ]
-            filtered_files = [
-                f
-                for f in filenames
-                if f.lower().endswith(ALLOWED_EXTENSIONS)
-            ]
-            yield current_root, dirnames, filtered_files
-
-    image_module.Local.get_exif_data = staticmethod(safe_get_exif)
-    image_module.Image.open = safe_image_open
-    image_module.os.walk = filtered_walk
-    try:
-        return image_module.Local.load_images(
-            directory=str(root),
-            create_thumbnails=create_thumbnails,
-            thumbnail_size=thumbnail_size,
+        Returns SKIP_UNREADABLE or SKIP_NO_GEOTAGS instead of a row so the parent
+        can report skipped files in one warning; a failed thumbnail leaves
+        thumb_url as None. Runs inside worker processes, which pickle it by
+        reference to this class.
+        """
+        global _timezone_finder
+
+        img = cls.open_image(path)
+        if img is None:
+            return SKIP_UNREADABLE
+        try:
+            exif_data = cls.get_exif_data(img)
+        finally:
+            img.close()
+
+        try:
+            geotags = cls._get_geotagging(exif_data)
+            lat, lon = cls._get_coordinates(geotags)
+            lat, lon = float(lat), float(lon)
+        except Exception:
+            return SKIP_NO_GEOTAGS
+
+        focal_length = cls._get_focal_length(exif_data)
+        camera_model = cls._get_camera_model(exif_data)
+
+        captured_at = None
+        captured_at_str = exif_data.get("DateTime")
+        if captured_at_str:
+            if _timezone_finder is None:
+                _timezone_finder = TimezoneFinder()
+            captured_at_naive = datetime.strptime(captured_at_str, "%Y:%m:%d %H:%M:%S")
+            tz_name = _timezone_finder.timezone_at(lat=lat, lng=lon)
+            if tz_name:
+                captured_at = pytz.timezone(tz_name).localize(captured_at_naive).isoformat()
+            else:
+                captured_at = captured_at_naive.isoformat()
+
+        thumb_url = None
+        if create_thumbnails:
+            thumb_path = os.path.join(
+                os.path.dirname(path), "thumbnails", f"thumb_{os.path.basename(path)}"
+            )
+            try:
+                if os.path.exists(thumb_path):
+                    thumb_url = thumb_path
+                else:
+                    thumb_url = cls.create_thumbnail(path, size=thumbnail_size)
+            except Exception:
+                # The parent reports rows left without a thumb_url in one warning.
+                pass
+
+        return (
+            lon,
+            lat,
+            os.path.basename(path),
+            np.float32(cls._get_image_altitude(geotags)),
+            cls._infer_camera_type(focal_length, camera_model),
+            captured_at,
+            np.float32(cls._get_image_direction(geotags)),
+            np.float32(exif_data.get("Orientation", None)),
+            path,
+            thumb_url,
         )
-    finally:
-        image_module.os.walk = original_walk
-        image_module.Local.get_exif_data = original_get_exif
-        image_module.Image.open = original_image_open
+
+    @classmethod
+    def load_image_chunk(
+        cls,
+        paths: list[str],
+        create_thumbnails: bool,
+        thumbnail_size: Tuple[int, int],
+    ) -> list[tuple | str]:
+        """
+        Run load_image over paths, so a worker handles a whole chunk per task.
+        """
+        return [cls.load_image(path, create_thumbnails, thumbnail_size) for path in paths]
+
+
+def prefetch_files(paths: list[str], window: threading.Semaphore) -> None:
+    for path in paths:
+        window.acquire()
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+
+
+def start_prefetch(paths: list[str]) -> threading.Semaphore | None:
+    """
+    Start a daemon thread that prefetches paths at most PREFETCH_WINDOW ahead of
+    submission; release the returned semaphore once per path submitted.
+    Returns None for small scans or platforms without posix_fadvise.
+    """
+    if not hasattr(os, "posix_fadvise") or len(paths) <= PREFETCH_WINDOW:
+        return None
+    window = threading.Semaphore(PREFETCH_WINDOW)
+    threading.Thread(target=prefetch_files, args=(paths, window), daemon=True).start()
+    return window
+
+
+def build_geoimageframe(columns: dict[str, np.ndarray], count: int):
+    """
+    Wrap the first count entries of ROW_COLUMNS arrays in a GeoImageFrame.
+
+    Points are built in one vectorized call and the arrays are used without
+    copying; columns come out in Local.load_images order.
+    """
+    columns = {col: array[:count] for col, array in columns.items()}
+    geometry = points_from_xy(columns.pop("lon"), columns.pop("lat"), crs="EPSG:4326")
+    # landlensdb never has lens distortion terms for local files.
+    columns["camera_parameters"] = np.full(count, np.nan)
+    columns = {col: columns[col] for col in FRAME_COLUMNS}
+    return GeoImageFrame(columns, geometry=geometry, copy=False)
 
 
-def build_geoimageframe(
-    root: Path,
+def load_images_filtered(
+    paths: list[str],
     create_thumbnails: bool,
     thumbnail_size: Tuple[int, int],
-    skip_dirs: Iterable[Path],
-):
-    gif = load_images_filtered(
-        root=root,
+    batch_size: int,
+    workers: int | None = None,
+    max_in_flight: int | None = None,
+) -> Iterator[GeoImageFrame]:
+    """
+    Extract EXIF rows and thumbnails for JPEG paths in a process pool, yielding
+    GeoImageFrames of up to batch_size rows as they fill.
+
+    At most max_in_flight paths are submitted to workers ahead of the rows
+    consumed so far (default: the batches UPSERT_QUEUE_SIZE can hold, plus one).
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or (UPSERT_QUEUE_SIZE + 1) * batch_size
+    chunksize = max(
+        1, min(EXTRACT_CHUNKSIZE, len(paths) // (workers * 4), max_in_flight // (workers * 2))
+    )
+    extract = partial(
+        FilteredLocal.load_image_chunk,
         create_thumbnails=create_thumbnails,
         thumbnail_size=thumbnail_size,
-        skip_dirs=skip_dirs,
     )
-    lower_urls = gif["image_url"].str.lower()
-    filtered = gif[lower_urls.str.endswith(ALLOWED_EXTENSIONS)]
-    dropped = len(gif) - len(filtered)
 
-    if filtered.empty:
-        raise ValueError(f"No JPEG images found in {root}")
+    def new_columns() -> dict[str, np.ndarray]:
+        return {col: np.empty(batch_size, dtype=dtype) for col, dtype in ROW_COLUMNS}
+
+    columns = new_columns()
+    arrays = list(columns.values())
+    count = 0
+    skipped: dict[str, list[str]] = {SKIP_UNREADABLE: [], SKIP_NO_GEOTAGS: []}
+    failed_thumbnails: list[str] = []
+    window = start_prefetch(paths)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    pending: deque = deque()
+    submitted = in_flight = 0
+
+    def submit_more() -> None:
+        nonlocal submitted, in_flight
+        while submitted < len(paths) and in_flight + chunksize <= max_in_flight:
+            chunk = paths[submitted:submitted + chunksize]
+            pending.append((chunk, executor.submit(extract, chunk)))
+            submitted += len(chunk)
+            in_flight += len(chunk)
+            if window is not None:
+                window.release(len(chunk))
+
+    try:
+        submit_more()
+        while pending:
+            chunk, future = pending.popleft()
+            chunk_rows = future.result()
+            in_flight -= len(chunk)
+            # Top up before filling the batch so workers stay busy while it's written.
+            submit_more()
+            for path, row in zip(chunk, chunk_rows):
+                if isinstance(row, str):
+                    skipped[row].append(path)
+                    continue
+                if create_thumbnails and row[THUMB_URL_INDEX] is None:
+                    failed_thumbnails.append(path)
+                for array, value in zip(arrays, row):
+                    array[count] = value
+                count += 1
+                if count == batch_size:
+                    yield build_geoimageframe(columns, count)
+                    columns = new_columns()
+                    arrays = list(columns.values())
+                    count = 0
+        if count:
+            yield build_geoimageframe(columns, count)
+    finally:
+        # If the consumer stopped early, drop the images still queued for workers.
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    for reason, skipped_paths in skipped.items():
+        if skipped_paths:
+            warnings.warn(
+                f"Skipped {len(skipped_paths)} {reason}; first 10: {skipped_paths[:10]}"
+            )
+    if failed_thumbnails:
+        warnings.warn(
+            f"Could not create thumbnails for {len(failed_thumbnails)} images; "
+            f"first 10: {failed_thumbnails[:10]}"
+        )
 
-    filtered.reset_index(drop=True, inplace=True)
-    return filtered, dropped
+
+def iter_in_background(items: Iterable, maxsize: int) -> Iterator:
+    """
+    Produce items on a daemon thread, buffering at most maxsize ahead of the consumer.
+
+    Exceptions from the producer are re-raised in the consumer. If the consumer
+    stops early, the producer gives up at its next put and closes items.
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+    done = object()
+
+    def put(entry) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=QUEUE_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+            put((done, None))
+        except BaseException as exc:  # noqa: BLE001
+            put((done, exc))
+        finally:
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, exc = buffer.get()
+            if exc is not None:
+                raise exc
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
 
 
 def fetch_existing_dirs(db: Postgres, table: str, root: Path, schema: str | None) -> set[Path]:
+    """
+    Return directories under root that already have images in the table.
+    """
     root_str = str(root.resolve())
     stmt = text(
         f"""
-        select distinct regexp_replace(image_url, '/[^/]+$', '') as dir
+        select image_url
         from {f'{schema}.{table}' if schema else table}
         where image_url like :prefix
         """
+    ).execution_options(yield_per=STREAM_BATCH_SIZE)
+
+    with db.engine.connect() as conn:
+        result = conn.execute(stmt, {"prefix": f"{escape_like(root_str)}%"})
+        dirs = {row[0].rpartition("/")[0] for row in result}
+    return {Path(d) for d in dirs if d}
+
+
+def fetch_existing_urls(
+    db: Postgres, table: str, schema: str | None, urls: list[str]
+) -> set[str]:
+    """
+    Return the subset of urls already stored in the table, looked up in chunks
+    through the image_url unique index.
+    """
+    stmt = text(
+        f"""
+        select image_url
+        from {f'{schema}.{table}' if schema else table}
+        where image_url = any(:urls)
+        """
     )
 
+    existing: set[str] = set()
     with db.engine.connect() as conn:
-        result = conn.execute(stmt, {"prefix": f"{root_str}%"})
-        dirs = {Path(row[0]).resolve() for row in result if row[0]}
-    return dirs
+        for start in range(0, len(urls), URL_LOOKUP_CHUNK_SIZE):
+            chunk = urls[start:start + URL_LOOKUP_CHUNK_SIZE]
+            existing.update(row[0] for row in conn.execute(stmt, {"urls": chunk}))
+    return existing
 
 
-def align_columns_to_table(db: Postgres, table: str, schema: str | None, gif):
+def fetch_table_columns(db: Postgres, table: str, schema: str | None) -> set[str]:
     """
-    Keep only columns that exist in the target table; warn about dropped ones.
+    Return the target table's column names, failing early if required ones are missing.
     """
-    from sqlalchemy import inspect, Table, MetaData
+    from sqlalchemy import inspect
 
     inspector = inspect(db.engine)
     table_cols = {col["name"] for col in inspector.get_columns(table, schema=schema)}
@@ -201,17 +694,97 @@ def align_columns_to_table(db: Postgres, table: str, schema: str | None, gif):
         raise ValueError(
             f"Target table '{table}' is missing required columns: {', '.join(sorted(missing_required))}"
         )
+    return table_cols
 
-    present_cols = [col for col in gif.columns if col in table_cols]
-    dropped_cols = [col for col in gif.columns if col not in table_cols]
+
+def align_columns_to_table(table: str, table_cols: set[str], columns: Iterable[str]) -> list[str]:
+    """
+    Keep only columns that exist in the target table; warn about dropped ones.
+    """
+    present_cols = [col for col in columns if col in table_cols]
+    dropped_cols = [col for col in columns if col not in table_cols]
     if dropped_cols:
         warnings.warn(
             f"Dropping columns not present in '{table}': {', '.join(dropped_cols)}"
         )
-    # ensure table is loaded with schema for upsert
-    meta = MetaData()
-    Table(table, meta, schema=schema, autoload_with=db.engine)
-    return gif[present_cols]
+    return present_cols
+
+
+def upsert_images(
+    db: Postgres,
+    table: str,
+    schema: str | None,
+    columns: list[str],
+    frames: Iterable,
+    conflict: str,
+) -> Tuple[int, int]:
+    """
+    COPY each frame into a staging table and merge it into the target with
+    ON CONFLICT (image_url), all in one transaction. Returns (sent, written).
+    """
+    column_list = sql.SQL(", ").join(map(sql.Identifier, columns))
+    target = sql.Identifier(schema, table) if schema else sql.Identifier(table)
+    stage = sql.Identifier(STAGING_TABLE)
+    if conflict == "update":
+        updated = [sql.Identifier(col) for col in columns if col != "image_url"]
+        # Leave unchanged rows alone so re-scans don't write new tuple versions and WAL.
+        on_conflict = sql.SQL(
+            "on conflict (image_url) do update set {} where ({}) is distinct from ({})"
+        ).format(
+            sql.SQL(", ").join(sql.SQL("{0} = excluded.{0}").format(col) for col in updated),
+            sql.SQL(", ").join(sql.SQL("t.{}").format(col) for col in updated),
+            sql.SQL(", ").join(sql.SQL("excluded.{}").format(col) for col in updated),
+        )
+    else:
+        on_conflict = sql.SQL("on conflict do nothing")
+
+    # Only the columns being sent, with the target's types but none of its
+    # constraints, defaults, or sequences. Float fields are staged as double
+    # precision so CSV values like 10.0 load even when the target column is an
+    # integer; the INSERT ... SELECT assignment-casts them.
+    stage_list = sql.SQL(", ").join(
+        sql.SQL("cast(null as double precision) as {}").format(sql.Identifier(col))
+        if col in FLOAT_COLUMNS
+        else sql.Identifier(col)
+        for col in columns
+    )
+    create_stage = sql.SQL(
+        "create temp table {} on commit drop as select {} from {} with no data"
+    ).format(stage, stage_list, target)
+    copy_stage = sql.SQL("copy {} ({}) from stdin with (format csv)").format(stage, column_list)
+    merge = sql.SQL("insert into {} as t ({}) select {} from {} {}").format(
+        target, column_list, column_list, stage, on_conflict
+    )
+    truncate_stage = sql.SQL("truncate {}").format(stage)
+
+    sent = written = 0
+    conn = db.engine.raw_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(create_stage)
+            copy_stmt = copy_stage.as_string(cur)
+            for gif in frames:
+                ewkb = shapely.to_wkb(
+                    shapely.set_srid(gif.geometry.values, 4326), hex=True, include_srid=True
+                )
+                frame = pd.DataFrame(gif[columns]).assign(geometry=ewkb)
+                buffer = io.StringIO()
+                frame.to_csv(buffer, index=False, header=False)
+                buffer.seek(0)
+                cur.copy_expert(copy_stmt, buffer)
+                cur.execute(merge)
+                # Rows inserted or updated; conflicts skipped by DO NOTHING or the
+                # unchanged-row guard aren't counted.
+                written += cur.rowcount
+                cur.execute(truncate_stage)
+                sent += len(frame)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return sent, written
 
 
 def import_images(args: argparse.Namespace) -> None:
@@ -221,6 +794,13 @@ def import_images(args: argparse.Namespace) -> None:
 
     config = load_config(args)
     db = Postgres(config["database_url"])
+    table_cols = fetch_table_columns(db, config["table_name"], config["table_schema"])
+
+    # Thumbnails are only recorded through thumb_url; don't decode and resize
+    # every image just to drop the column afterwards.
+    create_thumbnails = config["create_thumbnails"] and "thumb_url" in table_cols
+    if config["create_thumbnails"] and not create_thumbnails:
+        print(f"Table '{config['table_name']}' has no thumb_url column; skipping thumbnails.")
 
     skip_dirs: set[Path] = set()
     if config["skip_existing_dirs"]:
@@ -229,28 +809,61 @@ def import_images(args: argparse.Namespace) -> None:
         print(f"Will skip {len(skip_dirs)} directories already in the database.")
 
     print(f"Scanning {root} for JPEG images...")
-    gif, dropped = build_geoimageframe(
-        root,
-        config["create_thumbnails"],
-        config["thumbnail_size"],
-        skip_dirs,
-    )
-
-    if dropped:
-        print(f"Skipped {dropped} non-JPEG images that were discovered during scanning.")
+    paths = list(iter_image_paths(root, skip_dirs))
+    if not paths:
+        raise ValueError(f"No JPEG images found in {root}")
 
-    gif = align_columns_to_table(db, config["table_name"], config["table_schema"], gif)
+    existing: set[str] = set()
+    if config["conflict"] == "nothing":
+        # Rows that already exist would be left untouched, so don't extract them at all.
+        existing = fetch_existing_urls(db, config["table_name"], config["table_schema"], paths)
+        if existing:
+            paths = [p for p in paths if p not in existing]
+            print(f"Skipping {len(existing)} images already in the database.")
 
-    print(f"Table columns: {list(gif.columns)}")
-    print(f"Found {len(gif)} JPEG images; importing into {config['table_name']}...")
+    columns = align_columns_to_table(
+        config["table_name"], table_cols, [*FRAME_COLUMNS, "geometry"]
+    )
+    print(f"Table columns: {columns}")
+    print(f"Found {len(paths)} JPEG images; importing into {config['table_name']}...")
+
+    # Extraction runs ahead on a background thread while batches are written:
+    # at most UPSERT_QUEUE_SIZE finished batches wait in the queue, and workers
+    # are handed at most UPSERT_QUEUE_SIZE + 1 batches of paths beyond that.
+    frames = iter_in_background(
+        load_images_filtered(
+            paths,
+            create_thumbnails,
+            config["thumbnail_size"],
+            config["batch_size"],
+            workers=config["workers"],
+        ),
+        maxsize=UPSERT_QUEUE_SIZE,
+    )
     try:
-        db.upsert_images(gif, config["table_name"], conflict=config["conflict"])
-    except Exception as exc:  # noqa: BLE001
+        sent, written = upsert_images(
+            db,
+            config["table_name"],
+            config["table_schema"],
+            columns,
+            frames,
+            config["conflict"],
+        )
+    except psycopg2.Error as exc:
         raise RuntimeError(
             f"Upsert failed for table '{config['table_name']}' (schema={config['table_schema']}). "
-            f"Columns being sent: {list(gif.columns)}. Error: {exc}"
+            f"Columns being sent: {columns}. Error: {exc}"
         ) from exc
-    print("Import complete.")
+
+    if not sent:
+        if existing:
+            print("No new images to import.")
+            return
+        raise ValueError(f"No geotagged JPEG images found in {root}")
+    print(
+        f"Import complete: {sent} images sent, {written} inserted or updated "
+        f"({sent - written} unchanged or already present)."
+    )
 
 
 def parse_args() -> argparse.Namespace:
@@ -290,6 +903,16 @@ def parse_args() -> argparse.Namespace:
         "--thumbnail-size",
         help="Override thumbnail size, e.g., 256x256 (defaults to LANDLENS_THUMBNAIL_SIZE).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Processes used for EXIF parsing and thumbnails (defaults to LANDLENS_WORKERS or CPU count).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Rows sent per upsert batch (defaults to LANDLENS_BATCH_SIZE or 5000).",
+    )
     parser.add_argument(
         "--skip-existing-dirs",
         action="store_true",
@@ -298,7 +921,21 @@ def parse_args() -> argparse.Namespace:
     return parser.parse_args()
 
 
+def configure_worker_start() -> None:
+    """
+    Start extraction workers from a preloaded forkserver where available.
+
+    Plain fork copies the prefetch and queue threads' locks mid-use, and spawn
+    re-imports every dependency per worker; forkserver pays the imports once.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return
+    multiprocessing.set_start_method("forkserver")
+    multiprocessing.set_forkserver_preload(FORKSERVER_PRELOAD)
+
+
 def main() -> None:
+    configure_worker_start()
     try:
         import_images(parse_args())
     except Exception as exc:  # noqa: BLE001
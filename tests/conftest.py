@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# import_images.py is a standalone script, not an installed package.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
@@ -0,0 +1,481 @@
+import os
+import sys
+import threading
+import time
+import uuid
+import warnings
+from fractions import Fraction
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from PIL import Image
+from PIL.TiffImagePlugin import IFDRational
+from sqlalchemy import text
+
+import import_images
+
+
+def touch(root: Path, *relpaths: str) -> None:
+    for relpath in relpaths:
+        path = root / relpath
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+
+
+def scan(root: Path, skip_dirs=()) -> list[str]:
+    return list(import_images.iter_image_paths(root, [Path(p) for p in skip_dirs]))
+
+
+def rel(root: Path, paths: list[str]) -> set[str]:
+    return {Path(p).relative_to(root).as_posix() for p in paths}
+
+
+@pytest.fixture
+def root(tmp_path: Path) -> Path:
+    # iter_image_paths expects a resolved root.
+    root = (tmp_path / "images").resolve()
+    root.mkdir()
+    return root
+
+
+def test_skip_dirs_outside_root_are_ignored(root: Path, tmp_path: Path):
+    touch(root, "a/one.jpg", "b/two.jpg")
+    sibling = tmp_path / "images2"
+    skip_dirs = [tmp_path / "elsewhere", sibling / "a", tmp_path]
+
+    assert rel(root, scan(root, skip_dirs)) == {"a/one.jpg", "b/two.jpg"}
+
+
+def test_root_marked_as_skip_dir_yields_nothing(root: Path):
+    touch(root, "one.jpg", "a/two.jpg")
+
+    assert scan(root, [root]) == []
+
+
+def test_nested_skip_dir_is_pruned(root: Path):
+    touch(root, "a/b/pruned.jpg", "a/b/c/pruned.jpg", "a/kept.jpg", "a/c/kept.jpg", "b/kept.jpg")
+
+    assert rel(root, scan(root, [root / "a" / "b"])) == {
+        "a/kept.jpg",
+        "a/c/kept.jpg",
+        "b/kept.jpg",
+    }
+
+
+def test_macosx_and_thumbnail_dirs_are_dropped(root: Path):
+    touch(
+        root,
+        "__MACOSX/._one.jpg",
+        "thumbnails/thumb_one.jpg",
+        "site/thumbnails/thumb_two.jpg",
+        "site/day/__MACOSX/._two.jpg",
+        "one.jpg",
+        "site/two.jpg",
+    )
+
+    assert rel(root, scan(root)) == {"one.jpg", "site/two.jpg"}
+
+
+def test_suffix_match_is_case_insensitive(root: Path):
+    touch(root, "a.JpEg", "b.JPG", "c.jpeg", "d.png", "e.jpg.txt", "jpg", "f.")
+
+    assert rel(root, scan(root)) == {"a.JpEg", "b.JPG", "c.jpeg"}
+
+
+def test_only_regular_files_are_yielded(root: Path, tmp_path: Path):
+    touch(root, "real/a.jpg")
+    (tmp_path / "target_dir").mkdir()
+    os.symlink(tmp_path / "target_dir", root / "dir_link.jpg")
+    os.symlink(root / "real" / "a.jpg", root / "file_link.jpg")
+    if hasattr(os, "mkfifo"):
+        os.mkfifo(root / "fifo.jpg")
+
+    assert rel(root, scan(root)) == {"real/a.jpg", "file_link.jpg"}
+
+
+def test_order_matches_os_walk(root: Path):
+    touch(
+        root,
+        "z.jpg",
+        "a.jpg",
+        "m/b.jpg",
+        "m/n/c.jpg",
+        "m/a/d.jpg",
+        "b/e.JPG",
+        "b/thumbnails/thumb_e.jpg",
+        "q/r/s/f.jpeg",
+        "q/g.jpg",
+    )
+
+    expected = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in import_images.SKIPPED_DIR_NAMES]
+        expected.extend(
+            os.path.join(dirpath, f)
+            for f in filenames
+            if os.path.splitext(f)[1].lower() in import_images.ALLOWED_SUFFIXES
+        )
+
+    assert scan(root) == expected
+
+
+def make_frame(rows: list[tuple]):
+    columns = {
+        col: np.array([row[i] for row in rows], dtype=dtype)
+        for i, (col, dtype) in enumerate(import_images.ROW_COLUMNS)
+    }
+    return import_images.build_geoimageframe(columns, len(rows))
+
+
+def make_row(url: str, altitude: float = 10.0) -> tuple:
+    return (-157.9, 21.4, Path(url).name, altitude, "perspective", None, 90.0, 1.0, url, None)
+
+
+@pytest.fixture
+def test_db():
+    url = os.environ.get("LANDLENS_TEST_DATABASE_URL")
+    if not url:
+        pytest.skip("LANDLENS_TEST_DATABASE_URL is not set")
+    return import_images.Postgres(url)
+
+
+@pytest.fixture
+def make_table(test_db):
+    """
+    Create disposable tables on LANDLENS_TEST_DATABASE_URL. geometry is plain
+    text, so the upsert can be checked without PostGIS.
+    """
+    tables = []
+
+    def make(columns: str) -> str:
+        table = f"landlens_test_{uuid.uuid4().hex[:8]}"
+        with test_db.engine.begin() as conn:
+            conn.execute(
+                text(
+                    f"create table {table} (image_url text unique, name text, "
+                    f"geometry text, {columns})"
+                )
+            )
+        tables.append(table)
+        return table
+
+    yield make
+    with test_db.engine.begin() as conn:
+        for table in tables:
+            conn.execute(text(f"drop table {table}"))
+
+
+@pytest.fixture
+def upsert_table(test_db, make_table):
+    return test_db, make_table("altitude real")
+
+
+def xmins(db, table: str) -> dict[str, str]:
+    with db.engine.connect() as conn:
+        rows = conn.execute(text(f"select image_url, xmin::text from {table}"))
+        return dict(rows.all())
+
+
+UPSERT_COLUMNS = ["name", "altitude", "image_url", "geometry"]
+
+
+def test_update_skips_unchanged_rows(upsert_table):
+    db, table = upsert_table
+    rows = [make_row("/img/a.jpg"), make_row("/img/b.jpg")]
+
+    def upsert(rows):
+        return import_images.upsert_images(
+            db, table, None, UPSERT_COLUMNS, [make_frame(rows)], "update"
+        )
+
+    assert upsert(rows) == (2, 2)
+    before = xmins(db, table)
+
+    assert upsert(rows) == (2, 0)
+    assert xmins(db, table) == before
+
+    assert upsert([make_row("/img/a.jpg", altitude=20.0), rows[1]]) == (2, 1)
+    after = xmins(db, table)
+    assert after["/img/a.jpg"] != before["/img/a.jpg"]
+    assert after["/img/b.jpg"] == before["/img/b.jpg"]
+
+
+def test_nothing_leaves_existing_rows(upsert_table):
+    db, table = upsert_table
+
+    def upsert(rows):
+        return import_images.upsert_images(
+            db, table, None, UPSERT_COLUMNS, [make_frame(rows)], "nothing"
+        )
+
+    assert upsert([make_row("/img/a.jpg")]) == (1, 1)
+    assert upsert([make_row("/img/a.jpg", altitude=20.0), make_row("/img/b.jpg")]) == (2, 1)
+    with db.engine.connect() as conn:
+        altitude = conn.execute(
+            text(f"select altitude from {table} where image_url = '/img/a.jpg'")
+        ).scalar_one()
+    assert altitude == 10.0
+
+
+def test_float_fields_load_into_integer_columns(test_db, make_table):
+    table = make_table("altitude integer, compass_angle smallint, exif_orientation smallint")
+    columns = ["name", "altitude", "compass_angle", "exif_orientation", "image_url", "geometry"]
+
+    for conflict in ("update", "nothing"):
+        sent, _ = import_images.upsert_images(
+            test_db, table, None, columns, [make_frame([make_row("/img/a.jpg")])], conflict
+        )
+        assert sent == 1
+    with test_db.engine.connect() as conn:
+        row = conn.execute(
+            text(f"select altitude, compass_angle, exif_orientation from {table}")
+        ).one()
+    assert tuple(row) == (10, 90, 1)
+
+
+@pytest.mark.parametrize("conflict", ["nothing", "update"])
+def test_existing_urls_are_only_prefiltered_for_nothing(
+    conflict, root: Path, tmp_path: Path, monkeypatch
+):
+    touch(root, "a.jpg", "b.jpg")
+    existing = str(root / "a.jpg")
+    extracted = []
+
+    def fake_load_images_filtered(paths, *args, **kwargs):
+        extracted.extend(paths)
+        return iter([])
+
+    for var in list(os.environ):
+        if var.startswith("LANDLENS_"):
+            monkeypatch.delenv(var)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(import_images, "Postgres", lambda url: object())
+    monkeypatch.setattr(
+        import_images,
+        "fetch_table_columns",
+        lambda db, table, schema: {*import_images.FRAME_COLUMNS, "geometry"},
+    )
+    monkeypatch.setattr(
+        import_images,
+        "fetch_existing_urls",
+        lambda db, table, schema, urls: {existing} & set(urls),
+    )
+    monkeypatch.setattr(import_images, "load_images_filtered", fake_load_images_filtered)
+    monkeypatch.setattr(import_images, "upsert_images", lambda *args: (1, 0))
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        [
+            "import_images.py",
+            str(root),
+            "--database-url",
+            "postgresql://unused",
+            "--table",
+            "images",
+            "--conflict",
+            conflict,
+        ],
+    )
+
+    import_images.import_images(import_images.parse_args())
+
+    if conflict == "nothing":
+        assert extracted == [str(root / "b.jpg")]
+    else:
+        assert sorted(extracted) == [existing, str(root / "b.jpg")]
+
+
+def write_jpeg(path: Path, geotagged: bool = True) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    exif = Image.Exif()
+    exif[0x0110] = "TestCam"  # Model
+    exif.get_ifd(0x8769)[0x920A] = IFDRational(4, 1)  # FocalLength
+    if geotagged:
+        exif[0x8825] = {  # GPSInfo
+            1: "N",
+            2: (Fraction(21), Fraction(24), Fraction(0)),
+            3: "W",
+            4: (Fraction(157), Fraction(54), Fraction(0)),
+            6: Fraction(10),
+        }
+    Image.new("RGB", (64, 48), (120, 100, 150)).save(path, "JPEG", exif=exif.tobytes())
+
+
+def test_skips_and_thumbnail_failures_warn_once_per_kind(root: Path):
+    write_jpeg(root / "ok.jpg")
+    write_jpeg(root / "blocked" / "a.jpg")
+    write_jpeg(root / "blocked" / "b.jpg")
+    write_jpeg(root / "no_gps.jpg", geotagged=False)
+    (root / "bad.jpg").write_bytes(b"not a jpeg")
+    # A file where the thumbnails folder should go makes thumbnail creation fail.
+    (root / "blocked" / "thumbnails").touch()
+    paths = scan(root)
+
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        frames = list(
+            import_images.load_images_filtered(paths, True, (16, 16), batch_size=10, workers=1)
+        )
+
+    messages = sorted(str(w.message) for w in caught)
+    assert len(messages) == 3
+    assert messages[0].startswith("Could not create thumbnails for 2 images")
+    assert messages[1].startswith("Skipped 1 images without usable EXIF GPS data")
+    assert messages[2].startswith("Skipped 1 unreadable images")
+    [frame] = frames
+    thumbs = dict(zip(frame["image_url"], frame["thumb_url"]))
+    assert thumbs[str(root / "ok.jpg")] == str(root / "thumbnails" / "thumb_ok.jpg")
+    assert pd.isna(thumbs[str(root / "blocked" / "a.jpg")])
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        (None, import_images.DEFAULT_THUMBNAIL_SIZE),
+        ("", import_images.DEFAULT_THUMBNAIL_SIZE),
+        ("256x256", (256, 256)),
+        ("320X240", (320, 240)),
+        ("128,64", (128, 64)),
+        (" 256 x 256 ", (256, 256)),
+        ("256,,256", (256, 256)),
+        ("256x256x", (256, 256)),
+        ("x256x256", (256, 256)),
+        ("+5x5", (5, 5)),
+        ("-1x5", (-1, 5)),
+    ],
+)
+def test_parse_thumbnail_size_accepts(raw, expected):
+    assert import_images.parse_thumbnail_size(raw) == expected
+
+
+@pytest.mark.parametrize(
+    ("raw", "message"),
+    [
+        ("256", "must look like"),
+        ("256x", "must look like"),
+        ("256x256x256", "must look like"),
+        ("   ", "must look like"),
+        ("axb", "must be integers"),
+        ("25.6x25", "must be integers"),
+        ("wide,tall", "must be integers"),
+    ],
+)
+def test_parse_thumbnail_size_rejects(raw, message):
+    with pytest.raises(ValueError, match=message):
+        import_images.parse_thumbnail_size(raw)
+
+
+def test_iter_in_background_reraises_producer_errors():
+    def produce():
+        yield 1
+        raise RuntimeError("extraction failed")
+
+    items = import_images.iter_in_background(produce(), maxsize=1)
+    assert next(items) == 1
+    with pytest.raises(RuntimeError, match="extraction failed"):
+        next(items)
+
+
+def test_iter_in_background_stops_producer_when_consumer_stops():
+    produced = []
+    closed = threading.Event()
+
+    def produce():
+        try:
+            for i in range(1000):
+                produced.append(i)
+                yield i
+        finally:
+            closed.set()
+
+    items = import_images.iter_in_background(produce(), maxsize=1)
+    assert next(items) == 0
+    items.close()
+
+    assert closed.is_set()
+    # One item consumed, one buffered, and one blocked in put at most.
+    assert len(produced) <= 3
+
+
+def count_thumbnails(root: Path) -> int:
+    return len(list((root / "thumbnails").glob("thumb_*")))
+
+
+@pytest.fixture
+def many_jpegs(root: Path) -> list[str]:
+    for i in range(60):
+        write_jpeg(root / f"img{i:03d}.jpg")
+    return scan(root)
+
+
+def test_extraction_is_bounded_by_the_in_flight_window(root: Path, many_jpegs):
+    frames = import_images.iter_in_background(
+        import_images.load_images_filtered(
+            many_jpegs, True, (16, 16), batch_size=5, workers=1, max_in_flight=10
+        ),
+        maxsize=1,
+    )
+    assert len(next(frames)) == 5
+    time.sleep(1)
+
+    # At most three batches have been taken from the pool (consumed, queued,
+    # and blocked in put), plus max_in_flight paths submitted beyond them.
+    assert count_thumbnails(root) <= 3 * 5 + 10
+    frames.close()
+    stopped_at = count_thumbnails(root)
+    time.sleep(0.5)
+    assert count_thumbnails(root) == stopped_at < len(many_jpegs)
+
+
+def test_extraction_yields_every_row_in_order(many_jpegs):
+    frames = list(
+        import_images.load_images_filtered(
+            many_jpegs, False, (16, 16), batch_size=7, workers=2, max_in_flight=9
+        )
+    )
+
+    assert [len(frame) for frame in frames] == [7] * 8 + [4]
+    assert [url for frame in frames for url in frame["image_url"]] == many_jpegs
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("postgresql://u:p%40ss@db:5432/images", "postgresql+psycopg2://u:p%40ss@db:5432/images"),
+        ("postgresql+psycopg2://u@/images?host=/tmp", "postgresql+psycopg2://u@/images?host=/tmp"),
+    ],
+)
+def test_database_url_is_pinned_to_psycopg2(url, expected):
+    assert import_images.with_psycopg2_driver(url) == expected
+
+
+@pytest.mark.parametrize("url", ["postgresql+psycopg://u@db/images", "sqlite:///images.db"])
+def test_other_database_drivers_are_rejected(url):
+    with pytest.raises(ValueError, match="psycopg2 driver"):
+        import_images.with_psycopg2_driver(url)
+
+
+@pytest.mark.parametrize("image_format", ["PNG", "WEBP"])
+def test_non_jpeg_with_jpg_name_is_rejected_before_pil(image_format, root: Path, monkeypatch):
+    fake = root / "fake.jpg"
+    Image.new("RGB", (8, 8)).save(fake, image_format)
+    real = root / "real.jpg"
+    write_jpeg(real)
+    opened = []
+    pil_open = import_images.Image.open
+
+    def recording_open(path, *args, **kwargs):
+        opened.append(str(path))
+        return pil_open(path, *args, **kwargs)
+
+    monkeypatch.setattr(import_images.Image, "open", recording_open)
+
+    assert import_images.FilteredLocal.load_image(str(fake), False, (16, 16)) == (
+        import_images.SKIP_UNREADABLE
+    )
+    assert opened == []
+    row = import_images.FilteredLocal.load_image(str(real), False, (16, 16))
+    assert dict(zip((col for col, _ in import_images.ROW_COLUMNS), row))["image_url"] == str(real)
+    assert opened == [str(real)]